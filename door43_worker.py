@@ -0,0 +1,34 @@
+# NOTE: Passed to rq with --worker-class door43_worker.Door43Worker
+#   so that the /tmp folder gets cleared once when the worker starts
+#   (rather than whenever rq_settings or webhook gets imported, e.g., by the tests)
+
+from rq import Worker
+from rq.registry import StartedJobRegistry
+
+from general_tools.file_utils import empty_folder
+
+
+TMP_FOLDER_PATH = '/tmp/'
+
+
+class Door43Worker(Worker):
+    """
+    An rq worker that first clears out any Door43_ folders left in /tmp by earlier killed jobs.
+    """
+
+    def work(self, *args, **kwargs) -> bool:
+        self.clear_tmp_folder()
+        return super().work(*args, **kwargs)
+
+    def clear_tmp_folder(self, folder_path: str = TMP_FOLDER_PATH) -> None:
+        """
+        Removes the Door43_ temporary folders except for any belonging to jobs
+            that are still running (e.g., in another worker on the same host).
+
+        NOTE: Each job's folder is named Door43_<job id>_… (see webhook.get_temp_folder_prefix()).
+        """
+        running_job_ids = [job_id for queue in self.queues
+                           for job_id in StartedJobRegistry(queue=queue).get_job_ids()]
+        self.log.debug(f"Clearing {folder_path} folder (except for {len(running_job_ids)} running job(s))…")
+        empty_folder(folder_path, only_prefix='Door43_',
+                     keep_prefixes=[f'Door43_{job_id}_' for job_id in running_job_ids])
@@ -1,14 +1,30 @@
 import os
 import shutil
 import zipfile
-from typing import Optional
+from tempfile import SpooledTemporaryFile
+from typing import IO, Iterable, Optional, Union
 
 
-def unzip(source_file: str, destination_dir: str) -> None:
+class SeekableSpooledTemporaryFile(SpooledTemporaryFile):
+    """
+    A SpooledTemporaryFile that zipfile can read from.
+
+    Before Python 3.11, SpooledTemporaryFile has no readable()/seekable() methods
+        so ZipFile.open() fails with an AttributeError.
+    """
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+
+def unzip(source_file: Union[str, IO[bytes]], destination_dir: str) -> None:
     """
     Unzips <source_file> into <destination_dir>.
 
-    :param str source_file: The name of the file to read
+    :param str|file source_file: The name of the file to read (or an already open, seekable binary file)
     :param str destination_dir: The name of the directory to write the unzipped files
 
     NOTE: This is UNSAFE if the zipfile comes from an untrusted source
@@ -53,9 +69,11 @@ def add_file_to_zip(zip_file: str, file_name: str, arc_name: Optional[str] = Non
         zf.write(file_name, arc_name, compress_type)
 
 
-def empty_folder(folder_path: str, only_prefix: Optional[str] = None) -> None:
+def empty_folder(folder_path: str, only_prefix: Optional[str] = None, keep_prefixes: Iterable[str] = ()) -> None:
+    keep_prefixes = tuple(keep_prefixes)
     for filename in os.listdir(folder_path):
-        if not only_prefix or filename.startswith(only_prefix):
+        if (not only_prefix or filename.startswith(only_prefix)) \
+                and not (keep_prefixes and filename.startswith(keep_prefixes)):
             filepath = os.path.join(folder_path, filename)
             try:
                 shutil.rmtree(filepath)
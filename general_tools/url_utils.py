@@ -1,24 +1,85 @@
-import shutil
-import ssl
-import urllib.request as urllib2
-from contextlib import closing
+import errno
+import os
 from time import sleep
-from typing import Callable
-from urllib.error import HTTPError
+from typing import IO, Optional
+
+from requests import Response, Session
+from requests.adapters import HTTPAdapter
+from requests.exceptions import HTTPError, RequestException
 
 from app_settings.app_settings import AppSettings
+from general_tools.file_utils import SeekableSpooledTemporaryFile
+
+
+# One session for the life of the process so that connections to git.door43.org, etc.
+#   get reused (rather than re-handshaked) for retries and for the repos in a job_batch().
+# NOTE: rq's default Worker runs each job in a freshly forked work horse which imports this module itself,
+#   so this (like the other module-level caches) does NOT survive from one rq job to the next.
+SESSION = Session()
+SESSION.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=0))
+
+CONNECT_TIMEOUT, READ_TIMEOUT = 5, 60  # seconds
+COPY_BUFFER_SIZE = 1 << 20  # 1 MiB
+SPOOL_MAX_SIZE = 64 << 20  # 64 MiB -- larger downloads spill over into a temporary file on disk
 
 
 def download_file(url: str, outfile: str) -> None:
-    """Downloads a file and saves it."""
-    _download_file(url, outfile, urlopen=urllib2.urlopen)
+    """
+    Downloads a file and saves it.
+
+    If the server gives us the Content-Length, the file is allocated at that size before writing.
+    """
+    with open(outfile, 'wb', buffering=COPY_BUFFER_SIZE) as fp:
+        _download_file(url, fp, session=SESSION, preallocate=True)
+
+
+def download_to_spooled_file(url: str, max_size: int = SPOOL_MAX_SIZE) -> SeekableSpooledTemporaryFile:
+    """
+    Downloads a file into memory (or a temporary file if it's bigger than max_size)
+        and returns it rewound ready for reading.
+
+    The caller is responsible for closing the returned file.
+    """
+    spooled_file = SeekableSpooledTemporaryFile(max_size=max_size)
+    try:
+        _download_file(url, spooled_file, session=SESSION)
+    except Exception:
+        spooled_file.close()
+        raise
+    spooled_file.seek(0)
+    return spooled_file
+
+
+def _get_content_length(response: Response) -> Optional[int]:
+    """
+    Returns the Content-Length from the response headers
+        (or None if it's missing or not a valid length).
+    """
+    try:
+        content_length = int(response.headers.get('Content-Length', ''))
+    except ValueError:
+        return None
+    return content_length if content_length >= 0 else None
+
+
+def _preallocate_file(fp: IO[bytes], size: int) -> None:
+    """
+    Allocates the disk space for the (empty) file up front (where the OS and filesystem support it).
+    """
+    if not hasattr(os, 'posix_fallocate'):
+        return
+    try:
+        os.posix_fallocate(fp.fileno(), 0, size)
+    except OSError as e:
+        if e.errno not in (errno.EOPNOTSUPP, errno.EINVAL):  # i.e., not just unsupported here
+            raise e
 
 
-def _download_file(url: str, outfile: str, urlopen: Callable[[str], bytes]) -> None:
+def _download_file(url: str, fp: IO[bytes], session: Session, preallocate: bool = False) -> None:
     """
     Handles "HTTP Error 503: Service Unavailable" internally with an automatic wait and retry.
     """
-    AppSettings.logger.debug(f"_download_file( {url}, outfile={outfile}, …)…")
+    AppSettings.logger.debug(f"_download_file( {url}, fp={getattr(fp, 'name', fp)}, …)…")
     MAX_TRIES = 5
     INITIAL_WAIT_TIME = 5  # seconds
     num_tries = 0
@@ -27,23 +88,27 @@ def _download_file(url: str, outfile: str, urlopen: Callable[[str], bytes]) -> N
         if num_tries > 1:
             AppSettings.logger.debug(f"  _download_file try #{num_tries}…")
         need_to_wait = False
-        # err:Optional[Exception] = None
 
         try:
-            ctx = ssl.create_default_context()
-            ctx.check_hostname = False
-            ctx.verify_mode = ssl.CERT_NONE
-            with closing(urlopen(url)) as request:
-                with open(outfile, 'wb') as fp:
-                    shutil.copyfileobj(request, fp)
+            with session.get(url, stream=True, timeout=(CONNECT_TIMEOUT, READ_TIMEOUT)) as response:
+                response.raise_for_status()
+                fp.seek(0)  # Discard anything written by a previous try
+                fp.truncate()
+                if preallocate:
+                    content_length = _get_content_length(response)
+                    if content_length:
+                        _preallocate_file(fp, content_length)
+                for chunk in response.iter_content(chunk_size=COPY_BUFFER_SIZE):
+                    fp.write(chunk)
+                fp.truncate()  # In case we got less than the Content-Length (e.g., after decoding)
         except HTTPError as e:
             if num_tries < MAX_TRIES \
-                    and "HTTP Error 503: Service Unavailable" in str(e):
+                    and e.response is not None and e.response.status_code == 503:  # Service Unavailable
                 saved_e = e
                 need_to_wait = True
             else:
                 raise e
-        except IOError as e:
+        except (RequestException, IOError) as e:
             error_message = f"Error retrieving {url}: {e}"
             AppSettings.logger.critical(error_message)
             raise IOError(error_message)
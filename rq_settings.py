@@ -46,3 +46,5 @@ else:  # production
     tx_post_url = 'https://git.door43.org/tx/'
 
 REDIS_JOB_LIST = f'{prefix}Door43_outstanding_jobs'
+# door43-enqueue-job does HINCRBY +1 on '<owner>/<repo>' in this hash for each release it queues
+REDIS_QUEUED_RELEASES_HASH = f'{prefix}Door43_catalog_queued_releases'
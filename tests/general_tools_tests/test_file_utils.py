@@ -40,6 +40,28 @@ class FileUtilsTests(unittest.TestCase):
         with open(os.path.join(self.tmp_dir, os.path.basename(self.tmp_file))) as outf:
             self.assertEqual(outf.read(), "hello world")
 
+    def test_unzip_from_file_object(self):
+        self.tmp_dir = tempfile.mkdtemp(prefix='Door43_test_file_utils_')
+
+        with file_utils.SeekableSpooledTemporaryFile() as spooled_file:
+            with zipfile.ZipFile(spooled_file, "w") as zf:
+                zf.writestr('foo.txt', "hello world")
+            spooled_file.seek(0)
+            file_utils.unzip(spooled_file, self.tmp_dir)
+
+        with open(os.path.join(self.tmp_dir, 'foo.txt')) as outf:
+            self.assertEqual(outf.read(), "hello world")
+
+    def test_empty_folder_keeps_prefixes(self):
+        self.tmp_dir = tempfile.mkdtemp(prefix='Door43_test_file_utils_')
+        for folder_name in ('Door43_1_abc', 'Door43_2_def', 'other'):
+            os.mkdir(os.path.join(self.tmp_dir, folder_name))
+        with open(os.path.join(self.tmp_dir, 'Door43_3.txt'), "w") as tmpf:
+            tmpf.write("hello world")
+
+        file_utils.empty_folder(self.tmp_dir, only_prefix='Door43_', keep_prefixes=['Door43_2_'])
+        self.assertEqual(sorted(os.listdir(self.tmp_dir)), ['Door43_2_def', 'other'])
+
     def test_add_contents_to_zip(self):
         self.tmp_dir1 = tempfile.mkdtemp(prefix='Door43_test_file_utils_')
         zip_file = os.path.join(self.tmp_dir1, 'foo.zip')
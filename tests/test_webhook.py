@@ -1,10 +1,12 @@
 import json
+import os
 from unittest import TestCase, skip
-from unittest.mock import patch
+from unittest.mock import MagicMock, patch
 
 from app_settings.app_settings import AppSettings
 from rq_settings import prefix, webhook_queue_name
-from webhook import process_webhook_job
+from webhook import webhook_stats_prefix, process_webhook_job, job_batch, BatchJobError, get_repo_zip_url, \
+    count_other_queued_releases, check_for_newer_release
 
 
 def my_get_current_job():
@@ -25,8 +27,163 @@ class TestWebhook(TestCase):
     def test_prefix(self):
         self.assertEqual(prefix, AppSettings.prefix)
 
+    @staticmethod
+    def my_redis_connection(num_queued_releases, already_counted=False):
+        """
+        Returns a mocked Redis connection holding the given count for the repo (None for no count)
+        """
+        counts = {} if num_queued_releases is None else {'joel/en_twl': num_queued_releases}
+
+        def my_hincrby(_name, key, amount):
+            counts[key] += amount
+            return counts[key]
+
+        redis_connection = MagicMock()
+        redis_connection.hexists.side_effect = lambda _name, key: key in counts
+        redis_connection.hget.side_effect = lambda _name, key: counts.get(key)
+        redis_connection.hincrby.side_effect = my_hincrby
+        redis_connection.set.return_value = None if already_counted else True
+        redis_connection.counts = counts
+        return redis_connection
+
+    def test_count_other_queued_releases(self):
+        with open('tests/resources/webhook_release.json', 'rt') as json_file:
+            payload_json = json.load(json_file)
+        for num_queued_releases, expected_result, expected_count in ((None, None, None), (0, 0, 0),
+                                                                     (1, 0, 0), (3, 2, 2)):
+            with self.subTest(num_queued_releases=num_queued_releases):
+                redis_connection = self.my_redis_connection(num_queued_releases)
+                self.assertEqual(count_other_queued_releases(payload_json, redis_connection, '12345'),
+                                 expected_result)
+                self.assertEqual(redis_connection.counts.get('joel/en_twl'), expected_count)
+
+    def test_count_other_queued_releases_without_event(self):
+        with open('tests/resources/webhook_release.json', 'rt') as json_file:
+            payload_json = json.load(json_file)
+        del payload_json['DCS_event']
+        redis_connection = self.my_redis_connection(1)
+        self.assertIsNone(count_other_queued_releases(payload_json, redis_connection, '12345'))
+        self.assertEqual(redis_connection.counts['joel/en_twl'], 1)
+
+    def test_count_other_queued_releases_requeued_job(self):
+        with open('tests/resources/webhook_release.json', 'rt') as json_file:
+            payload_json = json.load(json_file)
+        redis_connection = self.my_redis_connection(2, already_counted=True)
+        self.assertEqual(count_other_queued_releases(payload_json, redis_connection, '12345'), 2)
+        self.assertEqual(redis_connection.counts['joel/en_twl'], 2)
+        redis_connection.hincrby.assert_not_called()
+
+    def test_check_for_newer_release_in_queued_batch(self):
+        with open('tests/resources/webhook_release.json', 'rt') as json_file:
+            payload_json = json.load(json_file)
+        payload_json['commits'] = [{'url': 'https://qa.door43.org/joel/en_twl/commit/v2'}]
+        newer_payload_json = json.loads(json.dumps(payload_json))
+        newer_payload_json['commits'][0]['url'] = 'https://qa.door43.org/joel/en_twl/commit/v3'
+        queued_job = MagicMock(args=([{'DCS_event': 'push'}, newer_payload_json],))
+        queued_job.get_status.return_value = 'queued'
+        our_queue = MagicMock(jobs=[queued_job])
+        our_queue.__len__.return_value = 1
+        self.assertEqual(check_for_newer_release(payload_json, our_queue),
+                         (True, 'qa.door43.org/joel/en_twl/commit/v3'))
+        self.assertEqual(check_for_newer_release(payload_json, our_queue, 0), (False, None))
+
+    def test_get_repo_zip_url(self):
+        self.assertEqual(get_repo_zip_url('https://git.door43.org/joel/commit_notes/commit/1234abcd'),
+                         'https://git.door43.org/joel/commit_notes/archive/1234abcd.zip')
+        self.assertEqual(get_repo_zip_url('https://git.door43.org/joel/commit/commit/1234abcd'),
+                         'https://git.door43.org/joel/commit/archive/1234abcd.zip')
+        self.assertEqual(get_repo_zip_url('https://git.door43.org/commit/en_twl/commit/1234abcd'),
+                         'https://git.door43.org/commit/en_twl/archive/1234abcd.zip')
+        self.assertEqual(get_repo_zip_url('https://qa.door43.org/joel/en_twl/archive/v2.zip'),
+                         'https://qa.door43.org/joel/en_twl/archive/v2.zip')
+
     @patch('webhook.get_current_job', side_effect=my_get_current_job)
     def test_typical_full_payload(self, mocked_get_current_job_function):
         with open('tests/resources/webhook_release.json', 'rt') as json_file:
             payload_json = json.load(json_file)
         process_webhook_job(payload_json)
+
+    @patch('webhook.handle_catalog_release')
+    def test_non_release_payload_is_ignored(self, mocked_handle_catalog_release):
+        with open('tests/resources/webhook_release.json', 'rt') as json_file:
+            payload_json = json.load(json_file)
+        payload_json['DCS_event'] = 'push'
+        job_descriptive_name = process_webhook_job(payload_json)
+        self.assertEqual(job_descriptive_name, "'joel/en_twl' push event")
+        mocked_handle_catalog_release.assert_not_called()
+
+    @patch('webhook.handle_catalog_release')
+    def test_malformed_payload_is_ignored(self, mocked_handle_catalog_release):
+        payload_json = {'DCS_event': 'push', 'repository': 'joel/en_twl', 'pusher': None}
+        job_descriptive_name = process_webhook_job(payload_json)
+        self.assertEqual(job_descriptive_name, "'None/None' push event")
+        mocked_handle_catalog_release.assert_not_called()
+
+    @patch('webhook.init_job_handler')
+    @patch('webhook.AppSettings.close_logger')
+    @patch('webhook._get_failure_logger', return_value=(MagicMock(), MagicMock()))
+    @patch('webhook.get_current_job')
+    @patch('webhook.push_release_to_catalog')
+    @patch('webhook.download_repos_files_into_temp_folder')
+    def test_job_batch_carries_on_after_failure(self, mocked_download, mocked_push, mocked_get_current_job,
+                                                mocked_get_failure_logger, mocked_close_logger,
+                                                mocked_init_job_handler):
+        with open('tests/resources/webhook_release.json', 'rt') as json_file:
+            payload_json = json.load(json_file)
+        failing_payload_json = json.loads(json.dumps(payload_json))
+        failing_payload_json['repository']['name'] = failing_payload_json['release']['zipball_url'] = 'bad_repo'
+        failing_payload_json['repository']['full_name'] = 'joel/bad_repo'
+
+        temp_dirs = {}
+
+        def my_download(temp_dir, repo_data_url, repo_name):
+            temp_dirs[repo_name] = temp_dir
+            if repo_name == 'bad_repo':
+                raise IOError("Unable to download")
+            return temp_dir
+
+        def my_push(temp_dir, release_path, repo_owner_username, repo_name, commit_id):
+            self.assertTrue(os.path.isdir(temp_dir))
+            self.assertFalse(os.path.exists(temp_dirs['bad_repo']))  # Removed as soon as its download failed
+
+        mocked_download.side_effect = my_download
+        mocked_push.side_effect = my_push
+        redis_connection = self.my_redis_connection(1)
+        redis_connection.llen.return_value = 0  # Nothing else in our queue
+        mocked_get_current_job.return_value.id = '12345'
+        mocked_get_current_job.return_value.connection = redis_connection
+        with self.assertRaises(BatchJobError) as context:
+            job_batch([failing_payload_json, payload_json])
+        self.assertEqual(redis_connection.counts['joel/en_twl'], 0)  # Taken off the count
+        stats_pipeline = mocked_init_job_handler.return_value.pipeline.return_value.__enter__.return_value
+        stats_pipeline.incr.assert_any_call(f'{webhook_stats_prefix}.jobs.completed', 1)
+        mocked_get_failure_logger.return_value[0].critical.assert_called_once()
+        self.assertEqual(len(context.exception.failures), 1)
+        self.assertIs(context.exception.failures[0][0], failing_payload_json)
+        self.assertEqual(mocked_download.call_count, 2)
+        mocked_push.assert_called_once()
+        self.assertEqual(mocked_push.call_args[0][3], 'en_twl')
+        self.assertFalse(os.path.exists(temp_dirs['en_twl']))
+
+    @patch('webhook.init_job_handler')
+    @patch('webhook.AppSettings.close_logger')
+    @patch('webhook.get_current_job')
+    @patch('webhook.push_release_to_catalog')
+    @patch('webhook.download_repos_files_into_temp_folder', side_effect=lambda temp_dir, *_args: temp_dir)
+    def test_job_batch_only_pushes_last_release_of_repo(self, mocked_download, mocked_push, mocked_get_current_job,
+                                                        mocked_close_logger, mocked_init_job_handler):
+        with open('tests/resources/webhook_release.json', 'rt') as json_file:
+            payload_json = json.load(json_file)
+        earlier_payload_json = json.loads(json.dumps(payload_json))
+        earlier_payload_json['release']['tag_name'] = 'v1'
+        redis_connection = self.my_redis_connection(2)
+        redis_connection.llen.return_value = 0  # Nothing else in our queue
+        mocked_get_current_job.return_value.id = '12345'
+        mocked_get_current_job.return_value.connection = redis_connection
+        job_batch([earlier_payload_json, payload_json])
+        stats_pipeline = mocked_init_job_handler.return_value.pipeline.return_value.__enter__.return_value
+        stats_pipeline.incr.assert_any_call(f'{webhook_stats_prefix}.jobs.completed', 2)
+        self.assertEqual(redis_connection.counts['joel/en_twl'], 0)  # Both taken off the count
+        mocked_download.assert_called_once()
+        mocked_push.assert_called_once()
+        self.assertEqual(mocked_push.call_args[0][4], 'v2')
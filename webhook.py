@@ -7,7 +7,7 @@
 #       job() function (at bottom here) is executed by rq package when there is an available entry in the named queue.
 
 import os
-import shutil
+import re
 import tempfile
 import traceback
 import urllib.parse
@@ -15,31 +15,34 @@ import logging
 import boto3
 import watchtower
 
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from functools import lru_cache
+from threading import Lock
 from time import time, sleep
-from typing import Dict, Tuple, Any, Optional
-from urllib.error import HTTPError
+from typing import Dict, List, Tuple, Any, Optional
+from urllib.parse import urlparse
 from zipfile import BadZipFile
+from requests.exceptions import HTTPError
 from rq import get_current_job, Queue
 from statsd import StatsClient
+from statsd.client.udp import Pipeline
 from app_settings.app_settings import AppSettings
-from general_tools.file_utils import unzip, empty_folder
-from general_tools.url_utils import download_file
-from rq_settings import ENQUEUE_NAME, prefix, debug_mode_flag, webhook_queue_name
+from general_tools.file_utils import unzip
+from general_tools.url_utils import download_file, download_to_spooled_file
+from rq_settings import ENQUEUE_NAME, prefix, debug_mode_flag, webhook_queue_name, REDIS_QUEUED_RELEASES_HASH
 
 OUR_NAME = 'Door43_catalog_job_handler'
-KNOWN_RESOURCE_SUBJECTS = ('Generic_Markdown',
-                           'Greek_Lexicon', 'Hebrew-Aramaic_Lexicon',
-                           # and 14 from https://api.door43.org/v3/subjects (last checked Mar 2020)
-                           'Bible', 'Aligned_Bible', 'Greek_New_Testament', 'Hebrew_Old_Testament',
-                           'Translation_Academy', 'Translation_Questions', 'Translation_Words',
-                           'Translation_Notes', 'TSV_Translation_Notes',
-                           'Open_Bible_Stories', 'OBS_Study_Notes', 'OBS_Study_Questions',
-                           'OBS_Translation_Notes', 'OBS_Translation_Questions',
-                           )
-
-AppSettings(prefix=prefix)
-if prefix not in ('', 'dev-'):
-    AppSettings.logger.critical(f"Unexpected prefix: '{prefix}' — expected '' or 'dev-'")
+KNOWN_RESOURCE_SUBJECTS = frozenset(('Generic_Markdown',
+                                     'Greek_Lexicon', 'Hebrew-Aramaic_Lexicon',
+                                     # and 14 from https://api.door43.org/v3/subjects (last checked Mar 2020)
+                                     'Bible', 'Aligned_Bible', 'Greek_New_Testament', 'Hebrew_Old_Testament',
+                                     'Translation_Academy', 'Translation_Questions', 'Translation_Words',
+                                     'Translation_Notes', 'TSV_Translation_Notes',
+                                     'Open_Bible_Stories', 'OBS_Study_Notes', 'OBS_Study_Questions',
+                                     'OBS_Translation_Notes', 'OBS_Translation_Questions',
+                                     ))
+
 door43_stats_prefix = f"door43-catalog.{'dev' if prefix else 'prod'}"
 job_handler_stats_prefix = f"{door43_stats_prefix}.job-handler"
 webhook_stats_prefix = f'{job_handler_stats_prefix}.webhook'
@@ -47,10 +50,48 @@ prefixed_our_name = prefix + OUR_NAME
 
 # Get the Graphite URL from the environment, otherwise use a local test instance
 graphite_url = os.getenv('GRAPHITE_HOSTNAME', 'localhost')
-stats_client = StatsClient(host=graphite_url, port=8125)
 
 project_types_invoked_string = f'{job_handler_stats_prefix}.types.invoked.unknown'
 
+# The separate FAILED log is only set up when a job first fails
+#   (and then reused for the rest of the process, e.g., for the rest of a job_batch())
+# NOTE: Each rq job runs in its own forked work horse, so none of these caches last from one rq job to the next.
+_failure_logger_lock = Lock()
+_boto_session: Optional[boto3.Session] = None
+_failure_watchtower_log_handlers: Dict[Tuple[str, str], watchtower.CloudWatchLogHandler] = {}
+
+COMMIT_PATH_RE = re.compile(r'/commit/(?=[^/]+$)')  # Only the /commit/ just before the commit id
+INVALID_COMMIT_BRANCHES = frozenset((None, 'UnknownCommitBranch', 'NoCommitBranch'))
+
+QUEUED_RELEASE_MARKER_EXPIRY_SECONDS = 7 * 24 * 60 * 60  # Longer than any job stays in the failed queue
+
+BATCH_MAX_WORKERS = 4  # Number of repos to download and unzip at once in job_batch()
+
+
+@lru_cache(maxsize=1)  # i.e., only set up once per process
+def init_job_handler() -> StatsClient:
+    """
+    Sets up AppSettings (including logging) and the statsd client.
+
+    Called at the start of each job (rather than at import time)
+        and returns the statsd client for the job.
+    """
+    AppSettings(prefix=prefix)
+    if prefix not in ('', 'dev-'):
+        AppSettings.logger.critical(f"Unexpected prefix: '{prefix}' — expected '' or 'dev-'")
+    return StatsClient(host=graphite_url, port=8125)
+
+
+def get_repo_zip_url(commit_url: str) -> str:
+    """
+    Returns the URL of the .zip file for the given commit URL
+        (only the /commit/ path segment before the commit id is changed,
+            not an owner or repo that happens to be called 'commit')
+    """
+    if commit_url.endswith('.zip'):
+        return commit_url
+    return COMMIT_PATH_RE.sub('/archive/', commit_url) + '.zip'
+
 
 def download_and_unzip_repo(base_temp_dir_name: str, commit_url: str, repo_dir: str) -> None:
     """
@@ -63,33 +104,48 @@ def download_and_unzip_repo(base_temp_dir_name: str, commit_url: str, repo_dir:
     :param base_temp_dir_name:
     :return: None
     """
-    repo_zip_url = commit_url if commit_url.endswith('.zip') \
-        else commit_url.replace('commit', 'archive') + '.zip'
-    repo_zip_file = os.path.join(base_temp_dir_name, repo_zip_url.rpartition(os.path.sep)[2])
+    repo_zip_url = get_repo_zip_url(commit_url)
+    # NOTE: This is a URL (not a filesystem path) so we split it on '/' (not os.path.sep)
+    repo_zip_file = os.path.join(base_temp_dir_name, urlparse(repo_zip_url).path.rpartition('/')[2] or 'repo.zip')
 
     MAX_TRIES = 4
     SECONDS_BETWEEN_TRIES = 5
     AppSettings.logger.info(f"Downloading and unzipping repo from {repo_zip_url} …")
     try_number = 1
+    use_zip_file = False  # We only fall back to saving the .zip to disk after getting a bad zip file
     while True:
         if try_number > 1:
             AppSettings.logger.warning(f"Try {try_number}: Downloading and unzipping repo from {repo_zip_url} …")
         try:
-            # If the file already exists, remove it, we want a fresh copy
-            if os.path.isfile(repo_zip_file):
-                os.remove(repo_zip_file)
-
-            try:
-                download_file(repo_zip_url, repo_zip_file)
-            finally:
-                AppSettings.logger.debug("  Downloading finished.")
-
-            AppSettings.logger.debug(f"  Unzipping {repo_zip_file} …")
-            try:
-                # NOTE: This is unsafe if the zipfile comes from an untrusted source
-                unzip(repo_zip_file, repo_dir)
-            finally:
-                AppSettings.logger.debug("  Unzipping finished.")
+            if use_zip_file:
+                # If the file already exists, remove it, we want a fresh copy
+                if os.path.isfile(repo_zip_file):
+                    os.remove(repo_zip_file)
+
+                try:
+                    download_file(repo_zip_url, repo_zip_file)
+                finally:
+                    AppSettings.logger.debug("  Downloading finished.")
+
+                AppSettings.logger.debug(f"  Unzipping {repo_zip_file} …")
+                try:
+                    # NOTE: This is unsafe if the zipfile comes from an untrusted source
+                    unzip(repo_zip_file, repo_dir)
+                finally:
+                    AppSettings.logger.debug("  Unzipping finished.")
+            else:  # Unzip straight from the (spooled) download without writing the .zip to disk first
+                try:
+                    spooled_zip_file = download_to_spooled_file(repo_zip_url)
+                finally:
+                    AppSettings.logger.debug("  Downloading finished.")
+
+                AppSettings.logger.debug(f"  Unzipping download from {repo_zip_url} …")
+                with spooled_zip_file:
+                    try:
+                        # NOTE: This is unsafe if the zipfile comes from an untrusted source
+                        unzip(spooled_zip_file, repo_dir)
+                    finally:
+                        AppSettings.logger.debug("  Unzipping finished.")
             break  # Get out of lopp
         except HTTPError as e:  # Could this also be a race condition within Gitea ???
             # We do less tries for this condition (with shorter waits also)
@@ -108,6 +164,7 @@ def download_and_unzip_repo(base_temp_dir_name: str, commit_url: str, repo_dir:
                 AppSettings.logger.info(f"  Waiting a few seconds before retrying…")
                 sleep(SECONDS_BETWEEN_TRIES)  # Try again after a few seconds
                 try_number += 1
+                use_zip_file = True  # Take the slower (original) path via a .zip file on disk
             else:
                 raise BadZipFile(f"Unable to get a good zip file from {repo_zip_url} after {try_number} tries")
 
@@ -117,8 +174,20 @@ def download_and_unzip_repo(base_temp_dir_name: str, commit_url: str, repo_dir:
             os.remove(repo_zip_file)
 
 
+def get_temp_folder_prefix() -> str:
+    """
+    Returns the prefix for the temporary folder(s) of the current job
+        which includes the rq job id (if we're running under rq)
+        so that any folder left in /tmp can be traced back to its job.
+    """
+    current_job = get_current_job()
+    return f'Door43_{current_job.id}_' if current_job else 'Door43_'
+
+
 def download_repos_files_into_temp_folder(base_temp_dir_name: str, commit_url: str, repo_name: str) -> str:
     """
+    Downloads and unzips the repo into a new folder inside base_temp_dir_name
+        and returns the path of the repo folder.
     """
     temp_folder_path = tempfile.mkdtemp(dir=base_temp_dir_name, prefix=f'{repo_name}_')
     download_and_unzip_repo(base_temp_dir_name, commit_url, temp_folder_path)
@@ -141,61 +210,120 @@ def download_repos_files_into_temp_folder(base_temp_dir_name: str, commit_url: s
         AppSettings.logger.warning(f"  Assuming that '{possible_folder_paths[0]}' folder (only one found) is the repo folder")
         return possible_folder_paths[0]
     # else:
-    print("Returning3", temp_folder_path)
+    AppSettings.logger.debug(f"  Returning {temp_folder_path} (the temporary folder itself) as the repo folder")
     return temp_folder_path
 
 
-def check_for_newer_release(submitted_json_payload: Dict[str, Any], our_queue) -> Tuple[bool, Optional[str]]:
+def count_other_queued_releases(submitted_json_payload: Dict[str, Any], redis_connection,
+                                job_id: Optional[str] = None) -> Optional[int]:
+    """
+    Takes this release off the per-repo count of queued releases
+        (which is kept in a Redis hash by door43-enqueue-job).
+
+    If job_id is given, the release is only taken off the count the first time
+        (so that a failed job that gets requeued by rq doesn't get taken off again).
+
+    Returns the number of other releases still queued for the same repo,
+        or None if there's no count being kept for this repo.
+    """
+    if submitted_json_payload.get('DCS_event') != 'release':
+        return None
+    try:
+        repo_full_name = submitted_json_payload['repository']['full_name']
+    except (KeyError, TypeError):
+        return None
+    if not redis_connection.hexists(REDIS_QUEUED_RELEASES_HASH, repo_full_name):
+        return None
+    if job_id is not None \
+            and not redis_connection.set(f'{REDIS_QUEUED_RELEASES_HASH}:{job_id}', 1,
+                                         nx=True, ex=QUEUED_RELEASE_MARKER_EXPIRY_SECONDS):
+        # We've already been taken off the count (i.e., this job has been requeued)
+        return max(0, int(redis_connection.hget(REDIS_QUEUED_RELEASES_HASH, repo_full_name) or 0))
+    num_queued_releases = redis_connection.hincrby(REDIS_QUEUED_RELEASES_HASH, repo_full_name, -1)
+    if num_queued_releases < 0:  # Shouldn't happen, but don't let the count go negative
+        # NOTE: Undone with another (atomic) increment, so concurrent jobs can't push it below zero
+        redis_connection.hincrby(REDIS_QUEUED_RELEASES_HASH, repo_full_name, 1)
+        return 0
+    return num_queued_releases
+
+
+def check_for_newer_release(submitted_json_payload: Dict[str, Any], our_queue,
+                            num_other_queued_releases: Optional[int] = None) -> Tuple[bool, Optional[str]]:
     """
     If there's already another release queued for the same repo,
         let's abort this one.
 
+    If num_other_queued_releases (from count_other_queued_releases()) is zero,
+        we don't need to load and scan all the queued jobs.
+
     Returns True if we can safely abort this build
                         and let a follow-up release trigger the repo rebuild.
     """
     len_our_queue = len(our_queue)
-    if submitted_json_payload['DCS_event'] == 'release' \
-            and len(submitted_json_payload['commits']) == 1 \
-            and len_our_queue:  # Have other entries
+    if submitted_json_payload.get('DCS_event') == 'release' \
+            and len(submitted_json_payload.get('commits') or ()) == 1 \
+            and len_our_queue \
+            and num_other_queued_releases != 0:  # Have other entries (possibly for this repo)
         AppSettings.logger.info(
             f"Checking for duplicate pushes in {len_our_queue} other queued job entr{'y' if len_our_queue == 1 else 'ies'}…")
-        my_url_bits = submitted_json_payload['commits'][0]['url'].split('/')
+        my_url_prefix = submitted_json_payload['commits'][0]['url'].rsplit('/', 1)[0]  # Without the commit number
         for queued_job in our_queue.jobs:
             if queued_job.get_status() == 'queued':
                 queued_job_args = queued_job.args  # tuple
                 assert len(queued_job_args) == 1
-                queued_job_parameter_dict = queued_job_args[0]
-                if queued_job_parameter_dict['DCS_event'] == 'release' \
-                        and len(queued_job_parameter_dict['commits']) == 1:
-                    queued_url_bits = queued_job_parameter_dict['commits'][0]['url'].split('/')
-                    if queued_url_bits[:6] == my_url_bits[:6]:  # commit number at end can be different
-                        AppSettings.logger.info("Found duplicate job later in queue—aborting this one!")
-                        job_descriptive_name = queued_job_parameter_dict['commits'][0]['url'].replace('https://', '')
-                        AppSettings.logger.info(f"  Not processing build for {job_descriptive_name}")
-                        return True, job_descriptive_name
+                # job_batch() jobs have a list of payloads rather than just one
+                queued_job_parameter_dicts = queued_job_args[0] if isinstance(queued_job_args[0], list) \
+                                                else [queued_job_args[0]]
+                for queued_job_parameter_dict in queued_job_parameter_dicts:
+                    if queued_job_parameter_dict.get('DCS_event') == 'release' \
+                            and len(queued_job_parameter_dict.get('commits') or ()) == 1:
+                        queued_url_prefix = queued_job_parameter_dict['commits'][0]['url'].rsplit('/', 1)[0]
+                        if queued_url_prefix == my_url_prefix:  # commit number at end can be different
+                            AppSettings.logger.info("Found duplicate job later in queue—aborting this one!")
+                            job_descriptive_name = queued_job_parameter_dict['commits'][0]['url'].replace('https://', '')
+                            AppSettings.logger.info(f"  Not processing build for {job_descriptive_name}")
+                            return True, job_descriptive_name
     return False, None
 
 
+def is_superseded_release(submitted_json_payload: Dict[str, Any], our_queue, job_id: str) -> Tuple[bool, Optional[str]]:
+    """
+    Takes this release off the count of queued releases
+        and then checks if there's a newer release queued for the same repo.
+
+    Returns the same as check_for_newer_release().
+    """
+    num_other_queued_releases = count_other_queued_releases(submitted_json_payload, our_queue.connection, job_id)
+    return check_for_newer_release(submitted_json_payload, our_queue, num_other_queued_releases)
+
+
 def clone_repo(url: str, dest: str) -> bool:
     os.system(f'git clone --depth 1 -- {url} {dest}')
     return os.path.exists(dest) and len(os.listdir(dest)) > 0
 
 
-def handle_catalog_release(repo_owner_username: str, repo_name: str, commit_id: str, repo_data_url: str):
+def handle_catalog_release(temp_dir: str, repo_owner_username: str, repo_name: str, commit_id: str,
+                           repo_data_url: str):
     """
     Handles copying a release to the Door43-Catalog organization
-    """
-    temp_dir = os.path.join(tempfile.gettempdir(), 'dcs_releases')
-    if not os.path.exists(temp_dir):
-        try:
-            os.mkdir(temp_dir)
-        except OSError as e:
-            print("Error: %s : %s" % (temp_dir, e.strerror))
 
+    All files are downloaded/cloned into temp_dir which the caller is expected to remove afterwards.
+    """
     # download release
     release_path = download_repos_files_into_temp_folder(temp_dir, repo_data_url, repo_name)
     AppSettings.logger.info(f'Downloaded release to {release_path}')
 
+    push_release_to_catalog(temp_dir, release_path, repo_owner_username, repo_name, commit_id)
+
+
+def push_release_to_catalog(temp_dir: str, release_path: str, repo_owner_username: str, repo_name: str,
+                            commit_id: str):
+    """
+    Copies the already downloaded release files (in release_path) into the Door43-Catalog repo
+        and pushes it
+
+    NOTE: This changes the current working directory, so don't call it from more than one thread at once.
+    """
     # create/clone repo
     repo_remote = f'https://{urllib.parse.quote(AppSettings.dcs_user)}:{urllib.parse.quote(AppSettings.dcs_password)}@{AppSettings.dcs_domain}/Door43-Catalog/{repo_name}.git'
     repo_url = f'https://{AppSettings.dcs_domain}/Door43-Catalog/{repo_name}.git'
@@ -224,12 +352,14 @@ def handle_catalog_release(repo_owner_username: str, repo_name: str, commit_id:
     AppSettings.logger.info(f'Pushing release to {repo_remote}')
     os.system(f'git push upstream master')
 
-    # clean up files
-    if os.path.exists(temp_dir):
-        try:
-            shutil.rmtree(temp_dir)
-        except OSError as e:
-            print("Error: %s : %s" % (temp_dir, e.strerror))
+
+@lru_cache(maxsize=4096)  # Mostly helps job_batch() where many releases come from the same few repo owners
+def get_ascii_username(username: str) -> str:
+    """
+    Seems that statsd 3.3.0 can only handle ASCII chars (not full Unicode)
+        so this replaces any non-ASCII chars with '?'
+    """
+    return username.encode('ascii', 'replace').decode('ascii')
 
 
 def get_release_info(queued_json_payload: Dict[str, Any]) -> Dict[str, Any] or None:
@@ -278,7 +408,7 @@ def get_release_info(queued_json_payload: Dict[str, Any]) -> Dict[str, Any] or N
     elif tag_name:
         commit_type = 'tag'
         commit_id = tag_name
-    elif commit_branch not in (None, 'UnknownCommitBranch', 'NoCommitBranch'):
+    elif commit_branch not in INVALID_COMMIT_BRANCHES:
         commit_type = 'branch'
         commit_id = commit_branch
     else:
@@ -300,40 +430,38 @@ def get_release_info(queued_json_payload: Dict[str, Any]) -> Dict[str, Any] or N
         return None
 
 
-def process_webhook_job(queued_json_payload: Dict[str, Any]) -> str:
+def _get_dict_field(json_dict: Dict[str, Any], field_name: str) -> Dict[str, Any]:
     """
-    Parameters:
-        queued_json_payload is a dict
+    Returns the named sub-dict of the JSON payload (or an empty dict if it's missing or isn't a dict).
+    """
+    field_value = json_dict.get(field_name)
+    return field_value if isinstance(field_value, dict) else {}
 
-    It gathers details from the JSON payload.
 
-    The given payload will be automatically appended to the 'failed' queue
-        by rq if an exception is thrown in this module.
+def get_release_to_process(queued_json_payload: Dict[str, Any],
+                           stats_pipeline: Pipeline) -> Tuple[Optional[Dict[str, Any]], str]:
     """
-    AppSettings.logger.debug(f"WEBHOOK {prefix + ' ' if prefix else ''}processing: {queued_json_payload}")
+    Updates the repo/owner/pusher stats from the JSON payload
+        and gets the release info if it's a release that we need to push to the Door43-Catalog.
 
+    Returns the release info (or None if there's nothing to process)
+        and a descriptive name for the job.
+    """
     #  Update repo/owner/pusher stats
     #   (all the following fields are expected from the Gitea webhook from push)
-    try:
-        stats_client.set(f'{webhook_stats_prefix}.repo_ids', queued_json_payload['repository']['id'])
-    except (KeyError, AttributeError, IndexError, TypeError):
-        stats_client.set(f'{webhook_stats_prefix}.repo_ids', 'No id')
-    try:
-        stats_client.set(f'{webhook_stats_prefix}.owner_ids', queued_json_payload['repository']['owner']['id'])
-    except (KeyError, AttributeError, IndexError, TypeError):
-        stats_client.set(f'{webhook_stats_prefix}.owner_ids', 'No id')
-    try:
-        stats_client.set(f'{webhook_stats_prefix}.pusher_ids', queued_json_payload['pusher']['id'])
-    except (KeyError, AttributeError, IndexError, TypeError):
-        stats_client.set(f'{webhook_stats_prefix}.pusher_ids', 'No id')
-
-    # Get the commit_id, commit_url
-    try:
-        default_branch = queued_json_payload['repository']['default_branch']
-    except KeyError:
-        AppSettings.logger.critical("No default branch specified")
-        default_branch = 'NoDefaultBranch'
-    AppSettings.logger.debug(f"Got default_branch='{default_branch}'")
+    repository = _get_dict_field(queued_json_payload, 'repository')
+    repo_owner = _get_dict_field(repository, 'owner')
+    pusher = _get_dict_field(queued_json_payload, 'pusher')
+    stats_pipeline.set(f'{webhook_stats_prefix}.repo_ids', repository.get('id', 'No id'))
+    stats_pipeline.set(f'{webhook_stats_prefix}.owner_ids', repo_owner.get('id', 'No id'))
+    stats_pipeline.set(f'{webhook_stats_prefix}.pusher_ids', pusher.get('id', 'No id'))
+
+    # Releases are the only events that we handle, so don't waste any time on anything else
+    dcs_event = queued_json_payload.get('DCS_event')
+    if dcs_event != 'release':
+        AppSettings.logger.info(f"Ignoring '{dcs_event}' event")
+        stats_pipeline.incr(f'{webhook_stats_prefix}.events.ignored.{dcs_event}')
+        return None, f"'{repo_owner.get('username')}/{repository.get('name')}' {dcs_event} event"
 
     release = get_release_info(queued_json_payload)
     # TRICKY: we are pushing releases to the Door43-Catalog, so we ignore events coming from there.
@@ -345,26 +473,109 @@ def process_webhook_job(queued_json_payload: Dict[str, Any]) -> str:
         our_identifier = f"'{release['pusher_username']}' releasing '{release['repo_owner_username']}/{release['repo_name']}'"
         AppSettings.logger.info(f"Processing job for {our_identifier} for \"{release['action_message']}\"")
 
-        # Seems that statsd 3.3.0 can only handle ASCII chars (not full Unicode)
-        ascii_repo_owner_username_bytes = release['repo_owner_username'].encode('ascii',
-                                                                                'replace')  # Replaces non-ASCII chars with '?'
-        adjusted_repo_owner_username = ascii_repo_owner_username_bytes.decode('utf-8')  # Recode as a str
-        stats_client.incr(f'{webhook_stats_prefix}.users.invoked.{adjusted_repo_owner_username}')
+        adjusted_repo_owner_username = get_ascii_username(release['repo_owner_username'])
+        stats_pipeline.incr(f'{webhook_stats_prefix}.users.invoked.{adjusted_repo_owner_username}')
+        return release, our_identifier
 
-        handle_catalog_release(release['repo_owner_username'], release['repo_name'], release['commit_id'],
-                               release['repo_data_url'])
-        job_descriptive_name = f'{our_identifier}'
-    else:
-        # There was no valid event to process
-        AppSettings.logger.critical(f"Nothing to process for '{queued_json_payload['DCS_event']}'!")
-        repo_owner_username = queued_json_payload['repository']['owner']['username']
-        repo_name = queued_json_payload['repository']['name']
-        job_descriptive_name = f"'{repo_owner_username}/{repo_name}'"
+    # There was no valid event to process
+    AppSettings.logger.critical(f"Nothing to process for '{dcs_event}'!")
+    return None, f"'{repo_owner.get('username')}/{repository.get('name')}'"
+
+
+def process_webhook_job(queued_json_payload: Dict[str, Any], stats_pipeline: Optional[Pipeline] = None) -> str:
+    """
+    Parameters:
+        queued_json_payload is a dict
+        stats_pipeline (optional) is the statsd pipeline for the job
+            (if not given, a new one is used and sent before returning)
+
+    It gathers details from the JSON payload.
+
+    The given payload will be automatically appended to the 'failed' queue
+        by rq if an exception is thrown in this module.
+    """
+    if stats_pipeline is None:
+        with init_job_handler().pipeline() as stats_pipeline:
+            return process_webhook_job(queued_json_payload, stats_pipeline)
+
+    AppSettings.logger.debug(f"WEBHOOK {prefix + ' ' if prefix else ''}processing: {queued_json_payload}")
+
+    release, job_descriptive_name = get_release_to_process(queued_json_payload, stats_pipeline)
+    if release:
+        # The folder (and everything in it) is removed again as soon as we're done, even if we fail
+        with tempfile.TemporaryDirectory(prefix=get_temp_folder_prefix()) as base_temp_dir_name:
+            handle_catalog_release(base_temp_dir_name, release['repo_owner_username'], release['repo_name'],
+                                   release['commit_id'], release['repo_data_url'])
 
     AppSettings.logger.info(f"{prefixed_our_name} process_webhook_job() for {job_descriptive_name} has finished.")
     return job_descriptive_name
 
 
+def _get_boto_session() -> boto3.Session:
+    """
+    Returns the boto3 session for this process
+        (created the first time as loading the service models is slow).
+    """
+    global _boto_session
+    with _failure_logger_lock:
+        if _boto_session is None:
+            _boto_session = boto3.Session(aws_access_key_id=os.environ['AWS_ACCESS_KEY_ID'],
+                                          aws_secret_access_key=os.environ['AWS_SECRET_ACCESS_KEY'],
+                                          region_name='us-west-2')
+    return _boto_session
+
+
+def _get_failure_logger() -> Tuple[logging.Logger, watchtower.CloudWatchLogHandler]:
+    """
+    Returns the logger (and its CloudWatch handler)
+        for the additional, separate FAILED log on AWS CloudWatch.
+
+    The CloudWatch handler is only created the first time for each log group/stream
+        and then reused by any later failures in this process.
+    """
+    test_mode_flag = os.getenv('TEST_MODE', '')
+    travis_flag = os.getenv('TRAVIS_BRANCH', '')
+    log_group_name = f"FAILED_{'' if test_mode_flag or travis_flag else prefix}tX" \
+                     f"{'_DEBUG' if debug_mode_flag else ''}" \
+                     f"{'_TEST' if test_mode_flag else ''}" \
+                     f"{'_TravisCI' if travis_flag else ''}"
+    logger2 = logging.getLogger(prefixed_our_name)
+    handler_key = (log_group_name, prefixed_our_name)
+    boto_session = _get_boto_session()
+    with _failure_logger_lock:
+        failure_watchtower_log_handler = _failure_watchtower_log_handlers.get(handler_key)
+        if failure_watchtower_log_handler is None:
+            failure_watchtower_log_handler = watchtower.CloudWatchLogHandler(
+                boto3_client=boto_session.client("logs"),
+                use_queues=True,
+                log_group_name=log_group_name,
+                stream_name=prefixed_our_name)
+            _failure_watchtower_log_handlers[handler_key] = failure_watchtower_log_handler
+            logger2.addHandler(failure_watchtower_log_handler)
+            logger2.setLevel(logging.DEBUG)
+            logger2.info(f"Logging to AWS CloudWatch group '{log_group_name}'"
+                         f" using key '…{os.environ['AWS_ACCESS_KEY_ID'][-2:]}'.")
+    return logger2, failure_watchtower_log_handler
+
+
+def _log_job_failures(failures: List[Tuple[Dict[str, Any], Exception]]) -> None:
+    """
+    Logs the exceptions to our log on AWS CloudWatch
+        and then also to an additional, separate FAILED log.
+    """
+    error_messages = [f"{prefixed_our_name} webhook threw an exception while processing:\n{queued_json_payload}"
+                      f"\ngetting exception:\n{e}: {''.join(traceback.format_exception(type(e), e, e.__traceback__))}"
+                      for queued_json_payload, e in failures]
+    for error_message in error_messages:
+        AppSettings.logger.critical(error_message)
+    AppSettings.close_logger()  # Ensure queued logs are uploaded to AWS CloudWatch
+    # Now attempt to log them to an additional, separate FAILED log
+    failure_logger, failure_watchtower_log_handler = _get_failure_logger()
+    for error_message in error_messages:
+        failure_logger.critical(error_message)
+    failure_watchtower_log_handler.flush()  # Ensure they're uploaded before the job ends
+
+
 def job(queued_json_payload: Dict[str, Any]) -> None:
     """
     This function is called by the rq package to process a job in the queue(s).
@@ -374,68 +585,154 @@ def job(queued_json_payload: Dict[str, Any]) -> None:
         but if the job throws an exception or times out (timeout specified in enqueue process)
             then the job gets added to the 'failed' queue.
     """
+    stats_client = init_job_handler()
     AppSettings.logger.debug(f"{OUR_NAME} received a job" + (" (in debug mode)" if debug_mode_flag else ""))
     start_time = time()
-    stats_client.incr(f'{webhook_stats_prefix}.jobs.attempted')
-    if 'echoed_from_production' in queued_json_payload and queued_json_payload['echoed_from_production']:
-        AppSettings.logger.info("This job was ECHOED FROM PRODUCTION (for dev- chain testing)!")
+    stats_client.incr(f'{webhook_stats_prefix}.jobs.attempted')  # Sent now in case the job gets killed
+    with stats_client.pipeline() as stats_pipeline:  # All sent together (in as few packets as possible) at the end
+        if 'echoed_from_production' in queued_json_payload and queued_json_payload['echoed_from_production']:
+            AppSettings.logger.info("This job was ECHOED FROM PRODUCTION (for dev- chain testing)!")
 
-    AppSettings.logger.debug(f"Clearing /tmp folder…")
-    empty_folder('/tmp/', only_prefix='Door43_')  # Stops failed jobs from accumulating in /tmp
+        current_job = get_current_job()
 
-    current_job = get_current_job()
+        our_queue = Queue(webhook_queue_name, connection=current_job.connection)
+        len_our_queue = len(our_queue)  # Should normally sit at zero here
 
-    our_queue = Queue(webhook_queue_name, connection=current_job.connection)
-    len_our_queue = len(our_queue)  # Should normally sit at zero here
+        abort_duplicate_flag, job_descriptive_name = is_superseded_release(queued_json_payload, our_queue,
+                                                                           current_job.id)
+        if not abort_duplicate_flag:
+            stats_pipeline.gauge(f'"{door43_stats_prefix}.enqueue-job.{ENQUEUE_NAME}.queue.length.current', len_our_queue)
+            AppSettings.logger.info(
+                f"Updated stats for '{door43_stats_prefix}.enqueue-job.{ENQUEUE_NAME}.queue.length.current' to {len_our_queue}")
 
-    abort_duplicate_flag, job_descriptive_name = check_for_newer_release(queued_json_payload, our_queue)
-    if not abort_duplicate_flag:
-        stats_client.gauge(f'"{door43_stats_prefix}.enqueue-job.{ENQUEUE_NAME}.queue.length.current', len_our_queue)
-        AppSettings.logger.info(
-            f"Updated stats for '{door43_stats_prefix}.enqueue-job.{ENQUEUE_NAME}.queue.length.current' to {len_our_queue}")
+            try:
+                job_descriptive_name = process_webhook_job(queued_json_payload, stats_pipeline)
+            except Exception as e:
+                # Catch most exceptions here so we can log them to CloudWatch
+                _log_job_failures([(queued_json_payload, e)])
+                # NOTE: following line removed as stats recording used too much disk space
+                # stats_client.gauge(user_projects_invoked_string, 1) # Mark as 'failed'
+                stats_pipeline.gauge(project_types_invoked_string, 1)  # Mark as 'failed'
+                raise e  # We raise the exception again so it goes into the failed queue
+
+        elapsed_milliseconds = round((time() - start_time) * 1000)
+        stats_pipeline.timing(f'{webhook_stats_prefix}.job.duration', elapsed_milliseconds)
+        if elapsed_milliseconds < 2000:
+            AppSettings.logger.info(
+                f"{prefixed_our_name} webhook job handling for {job_descriptive_name} completed in {elapsed_milliseconds:,} milliseconds.")
+        else:
+            AppSettings.logger.info(
+                f"{prefixed_our_name} webhook job handling for {job_descriptive_name} completed in {round(time() - start_time)} seconds.")
 
-        try:
-            job_descriptive_name = process_webhook_job(queued_json_payload)
-        except Exception as e:
-            # Catch most exceptions here so we can log them to CloudWatch
-            AppSettings.logger.critical(
-                f"{prefixed_our_name} webhook threw an exception while processing:\n{queued_json_payload}\ngetting exception:\n{e}: {traceback.format_exc()}")
-            AppSettings.close_logger()  # Ensure queued logs are uploaded to AWS CloudWatch
-            # Now attempt to log it to an additional, separate FAILED log
-            logger2 = logging.getLogger(prefixed_our_name)
-            test_mode_flag = os.getenv('TEST_MODE', '')
-            travis_flag = os.getenv('TRAVIS_BRANCH', '')
-            log_group_name = f"FAILED_{'' if test_mode_flag or travis_flag else prefix}tX" \
-                             f"{'_DEBUG' if debug_mode_flag else ''}" \
-                             f"{'_TEST' if test_mode_flag else ''}" \
-                             f"{'_TravisCI' if travis_flag else ''}"
-            aws_access_key_id = os.environ['AWS_ACCESS_KEY_ID']
-            boto3_client = boto3.client("logs", aws_access_key_id=aws_access_key_id,
-                               aws_secret_access_key=os.environ['AWS_SECRET_ACCESS_KEY'],
-                                region_name='us-west-2')
-            failure_watchtower_log_handler = watchtower.CloudWatchLogHandler(boto3_client=boto3_client,
-                                                    use_queues=False,
-                                                    log_group_name=log_group_name,
-                                                    stream_name=prefixed_our_name)
-            logger2.addHandler(failure_watchtower_log_handler)
-            logger2.setLevel(logging.DEBUG)
-            logger2.info(f"Logging to AWS CloudWatch group '{log_group_name}' using key '…{aws_access_key_id[-2:]}'.")
-            logger2.critical(
-                f"{prefixed_our_name} webhook threw an exception while processing:\n{queued_json_payload}\ngetting exception:\n{e}: {traceback.format_exc()}")
-            failure_watchtower_log_handler.close()
-            # NOTE: following line removed as stats recording used too much disk space
-            # stats_client.gauge(user_projects_invoked_string, 1) # Mark as 'failed'
-            stats_client.gauge(project_types_invoked_string, 1)  # Mark as 'failed'
-            raise e  # We raise the exception again so it goes into the failed queue
-
-    elapsed_milliseconds = round((time() - start_time) * 1000)
-    stats_client.timing(f'{webhook_stats_prefix}.job.duration', elapsed_milliseconds)
-    if elapsed_milliseconds < 2000:
-        AppSettings.logger.info(
-            f"{prefixed_our_name} webhook job handling for {job_descriptive_name} completed in {elapsed_milliseconds:,} milliseconds.")
-    else:
-        AppSettings.logger.info(
-            f"{prefixed_our_name} webhook job handling for {job_descriptive_name} completed in {round(time() - start_time)} seconds.")
+        stats_pipeline.incr(f'{webhook_stats_prefix}.jobs.completed')
+    AppSettings.close_logger()  # Ensure queued logs are uploaded to AWS CloudWatch
 
-    stats_client.incr(f'{webhook_stats_prefix}.jobs.completed')
+
+class BatchJobError(Exception):
+    """
+    Raised by job_batch() (after the rest of the batch has been processed)
+        if any of the payloads in the batch failed.
+    """
+
+    def __init__(self, failures: List[Tuple[Dict[str, Any], Exception]]):
+        self.failures = failures
+        super().__init__(f"{len(failures)} release{'' if len(failures) == 1 else 's'} in batch failed: "
+                         + '; '.join(f'{e.__class__.__name__}: {e}' for _payload, e in failures))
+
+
+def _get_release_repo_full_name(queued_json_payload: Dict[str, Any]) -> Optional[str]:
+    """
+    Returns the '<owner>/<repo>' name if the payload is a release (else None).
+    """
+    if queued_json_payload.get('DCS_event') != 'release':
+        return None
+    return _get_dict_field(queued_json_payload, 'repository').get('full_name')
+
+
+def job_batch(queued_json_payloads: List[Dict[str, Any]]) -> None:
+    """
+    This function is called by the rq package to process a batch of webhook payloads
+        that were queued together as one job (e.g., during a catalog-wide republish).
+
+    The repos are downloaded and unzipped concurrently (as that's mostly waiting for the network),
+        but are then pushed to the Door43-Catalog one at a time
+        (as push_release_to_catalog() changes the current working directory).
+
+    A failed release doesn't stop the rest of the batch,
+        but a BatchJobError is raised at the end so the job still goes into the 'failed' queue.
+    """
+    stats_client = init_job_handler()
+    AppSettings.logger.debug(f"{OUR_NAME} received a batch of {len(queued_json_payloads)} job(s)"
+                             + (" (in debug mode)" if debug_mode_flag else ""))
+    start_time = time()
+    failures: List[Tuple[Dict[str, Any], Exception]] = []
+    stats_client.incr(f'{webhook_stats_prefix}.jobs.attempted', len(queued_json_payloads))  # Sent now
+    with stats_client.pipeline() as stats_pipeline, ExitStack() as temp_folders:
+        current_job = get_current_job()
+        our_queue = Queue(webhook_queue_name, connection=current_job.connection)
+
+        # Only the last release of each repo in the batch needs to be pushed
+        last_release_numbers = {_get_release_repo_full_name(queued_json_payload): n
+                                for n, queued_json_payload in enumerate(queued_json_payloads)}
+        last_release_numbers.pop(None, None)
+
+        releases = []  # (payload, release, temp_folder) tuples
+        temp_folder_prefix = get_temp_folder_prefix()
+        for n, queued_json_payload in enumerate(queued_json_payloads):
+            # Each payload in the batch needs its own id for the count of queued releases
+            payload_job_id = f'{current_job.id}.{n}'
+            try:
+                repo_full_name = _get_release_repo_full_name(queued_json_payload)
+                if last_release_numbers.get(repo_full_name, n) != n:
+                    AppSettings.logger.info(f"Skipping release of '{repo_full_name}' as there's a later one in this batch")
+                    count_other_queued_releases(queued_json_payload, our_queue.connection, payload_job_id)
+                    continue
+                abort_duplicate_flag, _job_descriptive_name = is_superseded_release(queued_json_payload, our_queue,
+                                                                                    payload_job_id)
+                if abort_duplicate_flag:
+                    continue
+                release, _job_descriptive_name = get_release_to_process(queued_json_payload, stats_pipeline)
+            except Exception as e:
+                failures.append((queued_json_payload, e))
+                continue
+            if release:
+                # Each folder (and everything in it) is removed as soon as we're done with that release
+                #   (or when the batch finishes if we never get that far)
+                temp_folder = tempfile.TemporaryDirectory(prefix=temp_folder_prefix)
+                temp_folders.callback(temp_folder.cleanup)
+                releases.append((queued_json_payload, release, temp_folder))
+
+        def download_release(payload_release_folder: Tuple[Dict[str, Any], Dict[str, Any],
+                                                           tempfile.TemporaryDirectory]) -> str:
+            _payload, release, temp_folder = payload_release_folder
+            return download_repos_files_into_temp_folder(temp_folder.name, release['repo_data_url'],
+                                                         release['repo_name'])
+
+        with ThreadPoolExecutor(max_workers=BATCH_MAX_WORKERS) as executor:
+            download_futures = [executor.submit(download_release, entry) for entry in releases]
+            # Push each one (in order) as soon as it's downloaded while the later ones are still downloading
+            for (queued_json_payload, release, temp_folder), download_future in zip(releases, download_futures):
+                try:
+                    release_path = download_future.result()
+                    AppSettings.logger.info(f'Downloaded release to {release_path}')
+                    push_release_to_catalog(temp_folder.name, release_path, release['repo_owner_username'],
+                                            release['repo_name'], release['commit_id'])
+                except Exception as e:
+                    failures.append((queued_json_payload, e))
+                finally:
+                    temp_folder.cleanup()  # Don't let the disk use grow with the size of the batch
+
+        elapsed_milliseconds = round((time() - start_time) * 1000)
+        stats_pipeline.timing(f'{webhook_stats_prefix}.batch.duration', elapsed_milliseconds)
+        AppSettings.logger.info(f"{prefixed_our_name} webhook batch of {len(queued_json_payloads)} job(s)"
+                                f" completed in {elapsed_milliseconds:,} milliseconds"
+                                f" with {len(failures)} failure{'' if len(failures) == 1 else 's'}.")
+
+        # Counted the same as job(), i.e., ignored and superseded payloads are also 'completed'
+        stats_pipeline.incr(f'{webhook_stats_prefix}.jobs.completed', len(queued_json_payloads) - len(failures))
+        if failures:
+            _log_job_failures(failures)
+            stats_pipeline.gauge(project_types_invoked_string, 1)  # Mark as 'failed'
+    if failures:
+        raise BatchJobError(failures)  # So that the job goes into the failed queue
     AppSettings.close_logger()  # Ensure queued logs are uploaded to AWS CloudWatch